@@ -7,15 +7,21 @@
 
 from __future__ import annotations
 from pathlib import Path
-from typing import List, Optional, Tuple, Dict, Union, Set
+from typing import List, Optional, Tuple, Dict, Union, Set, Iterator, Callable
 from datetime import datetime
-import re, unicodedata, json, hashlib
-from collections import Counter, deque
+import re, unicodedata, json, hashlib, threading, queue, itertools, codecs, time, io, os
+from collections import Counter, deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from types import SimpleNamespace
 from urllib.parse import urljoin
 
 import pandas as pd
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright, Page, Frame, Response, Locator
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import lxml.html
+from lxml import etree
+from playwright.sync_api import sync_playwright, Page, Frame, Response, Locator, Error as PlaywrightError
 
 CONFIG = {
     "start_urls": [
@@ -38,12 +44,15 @@ CONFIG = {
         "slump","graph","daily","day","kikan","hist","replay","list","unit","hall"
     ],
     "resp_max_bytes": 1_800_000,
-    "resp_ring_capacity": 2200,
+    "resp_ring_capacity": 512,   # カードごとに空にするので 1 カード分あれば足りる
     "detail_click_retries": 2,
     "save_screenshot": False,    # 必要なら True
     "probe_grid_cols": 8,        # Canvasクリックの格子数（横）
     "probe_grid_rows": 4,        # Canvasクリックの格子数（縦）
     "probe_pause_ms": 140,       # クリック間の待機
+    "parse_workers": 4,          # HTML/JSON パースのスレッド数
+    "parallelism": 4,            # URL で開けるカードを並列に回すブラウザ数（1 で直列）
+    "block_resources": False,    # 画像/フォント/動画と計測タグを止める（True だと HTTP キャッシュも切れる）
 }
 
 OUT_DIR = Path(CONFIG["out_dir"]); OUT_DIR.mkdir(parents=True, exist_ok=True)
@@ -61,17 +70,35 @@ def log(msg: str):
         pass
 
 # ========= 正規表現 =========
-RE_NUM_G = r"(?P<num>[0-9０-９,]{1,6})\s*(?:G|ｇ|Ｇ|ゲーム)?"
-RE_KIND = r"(?P<kind>BIG|ＢＩＧ|B\W*B|ビッグ|REG|ＲＥＧ|R\W*B|レギュラ|RB|ＲＢ|BB|ＢＢ)"
-RE_HIT_INLINE_1 = re.compile(rf"{RE_NUM_G}\s*{RE_KIND}", re.IGNORECASE)
-RE_HIT_INLINE_2 = re.compile(rf"{RE_KIND}\s*{RE_NUM_G}", re.IGNORECASE)
-
-RE_DAI_LABEL   = re.compile(r"(台番|台番号)\s*[:：#]?\s*([0-9０-９]{2,5})")
-RE_DAI_ONLYNUM = re.compile(r"(?:\b|^)\s*([0-9０-９]{2,5})\s*(?:台)?\b")
-RE_DAI_GENERIC = re.compile(r"(?:台|No\.?|NO\.?|台番|台番号|#)\s*[:：#\- ]*\s*([0-9０-９]{2,5})", re.IGNORECASE)
-RE_DAI_NEAR    = re.compile(r"(?:台|だい)[^0-9０-９]{0,8}([0-9０-９]{2,5})|([0-9０-９]{2,5})[^0-9０-９]{0,8}(?:台|だい)")
+RE_NUM_BODY = r"[0-9０-９,]{1,6}"
+RE_G_SUFFIX = r"(?:G|ｇ|Ｇ|ゲーム)?"
+RE_KIND_BODY = r"BIG|ＢＩＧ|B\W*B|ビッグ|REG|ＲＥＧ|R\W*B|レギュラ|RB|ＲＢ|BB|ＢＢ"
+# 「123G BIG」と「BIG 123G」の両順序を1パスで拾う。
+# 先読みで消費しないので、片方の並びが他方の数字/種別を食い潰さない（各並びの重なり判定は _scan_line_for_hits 側）
+RE_HIT_INLINE = re.compile(
+    rf"(?=(?P<h1>(?P<num>{RE_NUM_BODY})\s*{RE_G_SUFFIX}\s*(?P<kind>{RE_KIND_BODY}))"
+    rf"|(?P<h2>(?P<kind2>{RE_KIND_BODY})\s*(?P<num2>{RE_NUM_BODY})\s*{RE_G_SUFFIX}))",
+    re.IGNORECASE,
+)
+
+# 台番号の表記ゆれ。優先度は 汎用（台番/台番号ラベルを含む）→ 数字のみ → 近傍
+_DAI_D = r"[0-9０-９]{2,5}"
+# 「数字のみ」と「近傍」は1パスで走査する。先読みなので消費せず、同じ位置では数字のみが優先して当たる
+RE_DAI_LOOSE = re.compile(
+    "(?="
+    rf"(?:\b|^)\s*(?P<only>{_DAI_D})\s*(?:台)?\b"
+    rf"|(?:(?:台|だい)[^0-9０-９]{{0,8}}(?P<near>{_DAI_D})|(?P<near2>{_DAI_D})[^0-9０-９]{{0,8}}(?:台|だい))"
+    ")"
+)
+RE_DAI_GENERIC = re.compile(rf"(?:台|No\.?|NO\.?|台番|台番号|#)\s*[:：#\- ]*\s*({_DAI_D})", re.IGNORECASE)
 RE_ONCLICK_DAI = re.compile(r"(?:dai|no|ban|cd_dai|unit|machine)\D{0,3}([0-9]{2,5})", re.IGNORECASE)
+RE_CD_DAI_KV   = re.compile(r"(?:cd_dai\s*=\s*|cd_dai\s*:\s*|cd_dai%5B%5D\s*=\s*|cd_dai%3D|cd_dai=)([0-9]{2,5})", re.IGNORECASE)
 RE_CD_DAI_ANY  = re.compile(r"(?:cd_dai|machineNo|unit_no|table_no|台番|台番号)\D*?([0-9]{2,5})", re.IGNORECASE)
+RE_DIGITS_2_5  = re.compile(r"[0-9]{2,5}")
+
+# レスポンス採取フィルタ（on_response で毎回リストを回さないよう事前コンパイル）
+_RESP_URL_RE = re.compile("|".join(re.escape(k) for k in CONFIG["resp_url_keywords"]))
+_CT_OK = ("json","html","xml","csv","javascript","plain")
 
 DAI_LINK_CSS = ",".join([
     # a系
@@ -96,63 +123,65 @@ DETAIL_LINK_SELECTORS = [
     "a:has-text('{}')","button:has-text('{}')",'role=link[name="{}"]','role=button[name="{}"]',
     "a[href*='nc-v05-']","a[href*='nc-v06-']","a[href*='nc-v12-']","a[href*='nc-v13-']","a[href*='nc-v02-']",
 ]
+# 一覧のカード（先頭ほど優先）と、モーダル型カードの閉じるボタン
+_CARD_SELECTORS = (
+    "a[href].card:visible","a:has(.card):visible",".card:visible",
+    "a[href].machine:visible","a[href]:visible",
+)
+_MODAL_CLOSE_SELECTORS = ("button:has-text('閉じる')", ".modal-close", ".close", "button[aria-label='Close']")
+PAGER_TEXTS = ("もっと見る", "次へ", "次", ">>", "›", ">", "さらに表示", "≫", "→")
 TAB_LABELS = ["本日","当日","1日前","2日前","履歴","ボーナス履歴","日別","グラフ","スランプ","詳細","データ","集計"]
 
 # ========= ユーティリティ =========
+# セル・行テキストは重複が多いのでメモ化する（ページ全文のような長文はキャッシュに載せない）
+_MEMO_MAX_LEN = 512
+
 def _normalize_text(s: str) -> str:
+    if len(s) <= _MEMO_MAX_LEN: return _normalize_text_cached(s)
+    return _normalize_text_raw(s)
+
+def _normalize_text_raw(s: str) -> str:
     s = unicodedata.normalize("NFKC", s)
     s = s.replace(",", " ")
     s = re.sub(r"\s+", " ", s)
     return s.strip()
 
+_normalize_text_cached = lru_cache(maxsize=16384)(_normalize_text_raw)
+
 def _num_to_int(num_raw: str) -> Optional[int]:
     try:
         return int(_normalize_text(num_raw).replace(" ", ""))
     except Exception:
         return None
 
+@lru_cache(maxsize=4096)
 def _kind_to_std(kind_raw: str) -> str:
     k = unicodedata.normalize("NFKC", kind_raw).upper()
     return "REG" if ("REG" in k or ("R" in k and "B" in k) or "レギュ" in k or k == "RB") else "BIG"
 
+@lru_cache(maxsize=4096)
 def _to_dai_str(s: Optional[str]) -> Optional[str]:
     if not s: return None
     s = _normalize_text(s)
-    m = re.search(r"[0-9]{2,5}", s)
+    m = RE_DIGITS_2_5.search(s)
     return m.group(0) if m else None
 
 def _extract_dai_from_text(text: str) -> Optional[str]:
     if not text: return None
-    t = _normalize_text(text)
-    for pat in (RE_DAI_LABEL, RE_DAI_GENERIC, RE_DAI_ONLYNUM, RE_DAI_NEAR):
-        m = pat.search(t)
-        if m:
-            g = None
-            if m.groups():
-                for grp in m.groups():
-                    if grp: g = grp; break
-            else:
-                g = m.group(1)
-            g = _to_dai_str(g)
-            if g and 2 <= len(g) <= 5: return g
-    return None
+    if len(text) <= _MEMO_MAX_LEN: return _extract_dai_from_text_cached(text)
+    return _extract_dai_from_text_raw(text)
 
-def _extract_all_dai_from_text(text: str) -> List[str]:
-    if not text: return []
+def _extract_dai_from_text_raw(text: str) -> Optional[str]:
     t = _normalize_text(text)
-    cands: List[str] = []
-    for pat in (RE_DAI_LABEL, RE_DAI_GENERIC, RE_DAI_NEAR, RE_DAI_ONLYNUM):
-        for m in pat.finditer(t):
-            gs = [g for g in m.groups() if g] if m.groups() else [m.group(1)]
-            for g in gs:
-                x = _to_dai_str(g)
-                if x and 2 <= len(x) <= 5:
-                    cands.append(x)
-    seen = set(); out=[]
-    for x in cands:
-        if x not in seen:
-            seen.add(x); out.append(x)
-    return out
+    m = RE_DAI_GENERIC.search(t)
+    if m: return m.group(1)
+    near = None
+    for m in RE_DAI_LOOSE.finditer(t):
+        if m.group("only"): return m.group("only")
+        if near is None: near = m.group("near") or m.group("near2")
+    return near
+
+_extract_dai_from_text_cached = lru_cache(maxsize=8192)(_extract_dai_from_text_raw)
 
 def _extract_dai_from_url(url: str) -> Optional[str]:
     if not url: return None
@@ -167,21 +196,126 @@ def _extract_dai_from_url(url: str) -> Optional[str]:
     return None
 
 def _freq_pick(cands: List[Optional[str]]) -> Optional[str]:
-    vals = [ _to_dai_str(c) for c in cands if _to_dai_str(c) and 2 <= len(_to_dai_str(c)) <= 5 ]
-    if not vals: return None
-    best, _ = Counter(vals).most_common(1)[0]
-    return best
+    cleaned = [d for d in (_to_dai_str(c) for c in cands) if d and 2 <= len(d) <= 5]
+    return Counter(cleaned).most_common(1)[0][0] if cleaned else None
 
 # ========= Playwright =========
-def _new_context(p, headless=True):
+# ページ側ヘルパーは init script で各フレームに一度だけ入れ、evaluate では名前を呼ぶだけにする
+#  - __pscHarvestDai: 属性ブロブの NFKC 正規化と台番候補抽出をブラウザ側で済ませる
+#  - __pscCollectDaiLinks: Playwright のセレクタエンジンを通さずネイティブ querySelectorAll で1往復
+_PSC_HELPERS_JS = r"""
+(() => {
+  window.__pscProbe = (cols, rows) => {
+    const boxes = [];
+    const pushGrid = (el) => {
+      const r = el.getBoundingClientRect();
+      if (!r.width || !r.height) return;
+      for (let i=0;i<rows;i++){
+        for (let j=0;j<cols;j++){
+          boxes.push({x: Math.floor(r.left + (j+0.5)*(r.width/cols)), y: Math.floor(r.top + (i+0.5)*(r.height/rows))});
+        }
+      }
+    };
+    // Canvas と、role=application/graphics-doc っぽい領域、pointer要素
+    document.querySelectorAll('canvas, [role=application], [role=graphics-document], .clickable').forEach(pushGrid);
+    return boxes;
+  };
+  window.__pscClickAt = (x, y) => {
+    const el = document.elementFromPoint(x, y);
+    if (!el) return false;
+    el.dispatchEvent(new MouseEvent('click', {bubbles:true, cancelable:true, clientX:x, clientY:y}));
+    return true;
+  };
+  const RES = [
+    /(?:dai|unit|machine|no|台|台番|台番号)[^0-9]{0,16}([0-9]{2,5})/gi,
+    /([0-9]{2,5})[^0-9]{0,16}(?:dai|unit|machine|no|台|台番|台番号)/gi,
+    /[?&#/](?:cd_dai|dai|no|unit|machine)[=/]*([0-9]{2,5})/gi,
+  ];
+  window.__pscHarvestDai = () => {
+    const out = new Set();
+    const sels = 'a, area, [onclick], [data-dai], [data-no], [data-unit], [data-machine], [data-ban], [value], [title], [alt], [aria-label]';
+    document.querySelectorAll(sels).forEach(e => {
+      const s = [
+        e.getAttribute('href') || '', e.getAttribute('onclick') || '', e.getAttribute('value') || '',
+        e.id || '', e.className || '', e.dataset ? JSON.stringify(e.dataset) : '',
+        (e.innerText || e.textContent || '').slice(0, 200),
+        e.getAttribute('alt') || '', e.getAttribute('title') || '', e.getAttribute('aria-label') || ''
+      ].join(' | ').normalize('NFKC');
+      for (const re of RES) for (const m of s.matchAll(re)) out.add(m[1]);
+    });
+    return [...out];
+  };
+  window.__pscCollectDaiLinks = (sel) => Array.from(document.querySelectorAll(sel), e => ({
+    h: e.getAttribute('href'),
+    t: (e.innerText || e.textContent || '').slice(0, 120),
+    d: e.getAttribute('data-dai') || e.getAttribute('data-no') || e.getAttribute('data-unit') || e.getAttribute('data-machine') || e.getAttribute('data-ban') || '',
+    oc: e.getAttribute('onclick') || ''
+  }));
+  // has-text / role=...[name=] で当たり得るラベルだけ返す（テキスト・aria/title/value・画像alt・labelledby を見る）
+  window.__pscPresentLabels = (labels) => {
+    const parts = [];
+    const visit = (root) => {
+      root.querySelectorAll('a, button, input, [role=tab], [role=link], [role=button]').forEach(e => {
+        parts.push(e.textContent || '', e.getAttribute('aria-label') || '', e.getAttribute('title') || '', e.getAttribute('value') || '');
+        e.querySelectorAll('img[alt]').forEach(i => parts.push(i.alt));
+        (e.getAttribute('aria-labelledby') || '').split(/\s+/).forEach(id => {
+          const r = id && document.getElementById(id);
+          if (r) parts.push(r.textContent || '');
+        });
+      });
+      root.querySelectorAll('*').forEach(e => { if (e.shadowRoot) visit(e.shadowRoot); });
+    };
+    visit(document);
+    const s = parts.join('\n');
+    return labels.filter(l => s.includes(l));
+  };
+  // 候補セレクタ（:visible を外したネイティブ CSS）を優先順に見て、見えている要素がある最初の番号を返す（無ければ -1）
+  window.__pscFirstVisible = (sels) => {
+    const visible = (e) => {
+      const r = e.getBoundingClientRect();
+      return r.width > 0 && r.height > 0 && getComputedStyle(e).visibility !== 'hidden';
+    };
+    return sels.findIndex(sel => Array.prototype.some.call(document.querySelectorAll(sel), visible));
+  };
+})();
+"""
+
+def _psc_call(ctx: Union[Page, Frame], fn: str, *args):
+    """init script のヘルパーを呼ぶ。入っていないフレーム（注入前に作られた文書など）はその場で入れて呼び直す"""
+    call = f"(a) => window.{fn} ? [window.{fn}(...a)] : null"
+    r = ctx.evaluate(call, list(args))
+    if r is None:
+        ctx.evaluate(_PSC_HELPERS_JS)
+        r = ctx.evaluate(call, list(args))
+    return r[0] if r else None
+
+# 解析に要らない読み込み。CSS は :visible 判定やプローブ座標が変わるので止めない。
+# ルートを1つでも張るとパターンに関係なくコンテキスト全体のブラウザ HTTP キャッシュが切れ、
+# カード/v06 を開くたびに CSS/JS も取り直しになる。なので既定は off（CONFIG["block_resources"]）。
+# 張るときも Python のコールバックは止めたいもの（拡張子と計測ホスト）にだけ走るようにする。
+BLOCK_EXTS = ("png", "jpe?g", "gif", "webp", "avif", "svg", "ico", "bmp",
+              "woff2?", "ttf", "otf", "eot", "mp4", "webm", "m4a", "mp3", "ogg")
+BLOCK_HOSTS = ("google-analytics", "googletagmanager", "doubleclick", "facebook.net")
+BLOCK_URL_RE = re.compile(
+    r"^[a-z]+://[^/?#]*(?:" + "|".join(re.escape(h) for h in BLOCK_HOSTS) + r")"
+    r"|\.(?:" + "|".join(BLOCK_EXTS) + r")(?:[?#]|$)", re.IGNORECASE)
+
+def _block_route(route):
+    try: route.abort()
+    except Exception: pass
+
+def _new_context(p, headless=True, storage_state: Optional[dict] = None):
+    """storage_state を渡すとそれを使う（並列ワーカーに本体コンテキストの Cookie/セッションを引き継ぐ）"""
     browser = p.chromium.launch(headless=headless)
     context = browser.new_context(
-        storage_state=CONFIG["auth_state"] if CONFIG["auth_state"] else None,
+        storage_state=storage_state or (CONFIG["auth_state"] if CONFIG["auth_state"] else None),
         locale="ja-JP",
         viewport={"width": 1400, "height": 900},
         user_agent=("Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/124 Safari/537.36"),
         extra_http_headers={"Accept-Language": "ja,en;q=0.9"},
     )
+    context.add_init_script(script=_PSC_HELPERS_JS)
+    if CONFIG.get("block_resources"): context.route(BLOCK_URL_RE, _block_route)
     page = context.new_page()
     return browser, context, page
 
@@ -190,6 +324,27 @@ def _goto(ctx: Union[Page, Frame], url: str):
     try: ctx.wait_for_load_state("networkidle", timeout=15_000)
     except Exception: pass
 
+def _safe_goto(page: Page, url: str, timeout: Optional[int] = None, attempts: int = 3) -> Optional[Response]:
+    """goto を指数バックオフ（0.25s, 0.5s, ...）で再試行する。4xx は再試行しても変わらないので即諦める"""
+    for i in range(attempts):
+        try:
+            resp = page.goto(url, timeout=timeout or CONFIG["timeout"], wait_until="domcontentloaded")
+            if resp is not None:
+                if resp.ok: return resp
+                if resp.status < 500: return None
+        except PlaywrightError:
+            pass
+        if i + 1 < attempts: time.sleep(0.25 * (2 ** i))
+    return None
+
+def _settle(page: Page, sentinel: Optional[str] = None, timeout: int = 1500) -> None:
+    """networkidle は計測タグ等で埋まりがちなので待たない。DOM 構築完了と目印セレクタの出現で良しとする"""
+    try: page.wait_for_load_state("domcontentloaded", timeout=CONFIG["timeout"])
+    except Exception: pass
+    if sentinel:
+        try: page.wait_for_selector(sentinel, state="attached", timeout=timeout)
+        except Exception: pass
+
 def _click_if_exists(ctx: Union[Page, Frame], selector: str, timeout=2400) -> bool:
     try:
         loc = ctx.locator(selector)
@@ -206,7 +361,7 @@ def _infinite_scroll_and_pager(page: Page):
         except Exception: h = last_h
         if h == last_h:
             clicked = False
-            for txt in ["もっと見る", "次へ", "次", ">>", "›", ">", "さらに表示", "≫", "→"]:
+            for txt in PAGER_TEXTS:
                 if _click_if_exists(page, f"a:has-text('{txt}')") or _click_if_exists(page, f"button:has-text('{txt}')"):
                     page.wait_for_timeout(CONFIG["scroll_pause_ms"]); clicked = True; break
             if not clicked: break
@@ -216,17 +371,25 @@ def _infinite_scroll_and_pager(page: Page):
     try: page.evaluate("() => window.scrollTo(0, 0)")
     except Exception: pass
 
-def _scroll_and_pager_ctx(ctx: Union[Page, Frame], rounds: Optional[int] = None):
+def _scroll_and_pager_ctx(ctx: Union[Page, Frame], rounds: Optional[int] = None, stable_rounds: Optional[int] = None):
+    """stable_rounds を指定すると、スクロール/ページャ操作のあとも高さと要素数が
+    その回数続けて変わらなければ打ち切る（効かないページャを rounds 回押し続けない）"""
     rounds = rounds or CONFIG["max_scroll_rounds"]
     last_h = 0
+    prev_sig = None; stable = 0
     for _ in range(rounds):
         try:
-            h = ctx.evaluate("() => document.body ? document.body.scrollHeight : 0")
+            h, n_el = ctx.evaluate("() => [document.body ? document.body.scrollHeight : 0, document.getElementsByTagName('*').length]")
         except Exception:
-            h = last_h
+            h, n_el = last_h, None
+        if stable_rounds:
+            sig = (h, n_el)
+            stable = stable + 1 if sig == prev_sig else 0
+            if stable >= stable_rounds: break
+            prev_sig = sig
         if h == last_h:
             clicked = False
-            for txt in ["もっと見る", "次へ", "次", ">>", "›", ">", "さらに表示", "≫", "→"]:
+            for txt in PAGER_TEXTS:
                 if _click_if_exists(ctx, f"a:has-text('{txt}')") or _click_if_exists(ctx, f"button:has-text('{txt}')"):
                     try: ctx.wait_for_load_state("domcontentloaded", timeout=4000)
                     except Exception: pass
@@ -240,50 +403,108 @@ def _scroll_and_pager_ctx(ctx: Union[Page, Frame], rounds: Optional[int] = None)
     except Exception: pass
 
 # ========= パース =========
+# 当たり明細は列ごとのリスト (dai, game, kind) で持ち回る。dict 化は _parse_using_ctx_and_ring の最後だけ
+HitCols = Tuple[List[Optional[str]], List[int], List[str]]
+
 def _scan_line_for_hits(line: str) -> List[Tuple[int, str]]:
-    hits: List[Tuple[int,str]] = []
-    for m in RE_HIT_INLINE_1.finditer(line):
-        gi = _num_to_int(m.group("num"))
-        if gi is not None: hits.append((gi, _kind_to_std(m.group("kind"))))
-    for m in RE_HIT_INLINE_2.finditer(line):
-        gi = _num_to_int(m.group("num"))
-        if gi is not None: hits.append((gi, _kind_to_std(m.group("kind"))))
-    return hits
-
-def _parse_hit_records_from_html(html: str) -> Tuple[List[Dict], List[str]]:
-    soup = BeautifulSoup(html, "lxml")
+    hits1: List[Tuple[int,str]] = []
+    hits2: List[Tuple[int,str]] = []
+    end1 = end2 = 0
+    for m in RE_HIT_INLINE.finditer(line):
+        if m.group("h1") is not None:
+            if m.start() < end1: continue
+            end1 = m.end("h1")
+            gi = _num_to_int(m.group("num"))
+            if gi is not None: hits1.append((gi, _kind_to_std(m.group("kind"))))
+        else:
+            if m.start() < end2: continue
+            end2 = m.end("h2")
+            gi = _num_to_int(m.group("num2"))
+            if gi is not None: hits2.append((gi, _kind_to_std(m.group("kind2"))))
+    return hits1 + hits2
+
+# lxml 直叩き（BS4 のノードラッパを経由しない）
+# パーサ/XPath はスレッド間で共有できないのでスレッドごとに作る
+_LX_LOCAL = threading.local()
+
+def _lx() -> SimpleNamespace:
+    lx = getattr(_LX_LOCAL, "lx", None)
+    if lx is None:
+        lx = _LX_LOCAL.lx = SimpleNamespace(
+            parser=lxml.html.HTMLParser(encoding="utf-8"),
+            text=etree.XPath(".//text()[not(parent::script or parent::style)]", smart_strings=False),
+            heads=[etree.XPath(f"(//{t})[1]") for t in ("h1","h2")] + [
+                etree.XPath(f"(//*[contains(concat(' ', normalize-space(@class), ' '), ' {c} ')])[1]")
+                for c in ("title","machine-name","dai-number","machineNo","no","tit","head","header")
+            ],
+        )
+    return lx
+
+def _el_text(el) -> str:
+    """BS4 の get_text(" ", strip=True) 相当（script/style/コメントは除外）"""
+    return " ".join(s for s in (t.strip() for t in _lx().text(el)) if s)
+
+def _parse_hit_records_from_html(html: str) -> Tuple[HitCols, List[str]]:
+    dais: List[Optional[str]] = []; games: List[int] = []; kinds: List[str] = []
+    try:
+        root = lxml.html.document_fromstring(html.encode("utf-8", errors="ignore"), parser=_lx().parser)
+    except (etree.ParserError, ValueError):
+        return (dais, games, kinds), []
     dai_cands: List[str] = []
-    page_dai = _extract_dai_from_text(soup.get_text(" ", strip=True)) or None
+    page_dai = _extract_dai_from_text(_el_text(root)) or None
     if page_dai: dai_cands.append(page_dai)
 
-    records: List[Dict] = []
-    for tbl in soup.select("table"):
-        for tr in tbl.select("tr"):
-            cells = [_normalize_text(c.get_text(" ", strip=True)) for c in tr.select("th,td")]
+    for tbl in root.iter("table"):
+        for tr in tbl.iter("tr"):
+            cells = [_normalize_text(_el_text(c)) for c in tr.iter("th", "td")]
             if not cells: continue
             row_text = " ".join(cells)
             row_dai = _extract_dai_from_text(row_text)
             if row_dai: dai_cands.append(row_dai)
             for gi, k in _scan_line_for_hits(row_text):
-                records.append({"dai": _to_dai_str(row_dai), "game": gi, "kind": k})
-    if not records:
-        full = _normalize_text(soup.get_text(" ", strip=True))
-        for line in re.split(r"[ \u3000]*[\r\n]+[ \u3000]*|(?<=G)\s", full):
-            line = _normalize_text(line)
+                dais.append(_to_dai_str(row_dai)); games.append(gi); kinds.append(k)
+    if not games:
+        # 正規化済みの全文には改行も連続空白も残らないので、区切りは「G 」の直後だけ。
+        # 各片も正規化済みのまま（NFKC は冪等）なので、行ごとの再正規化は不要
+        full = _normalize_text(_el_text(root))
+        for line in full.replace("G ", "G\n").split("\n"):
             if not line: continue
             row_dai = _extract_dai_from_text(line)
             if row_dai: dai_cands.append(row_dai)
             for gi, k in _scan_line_for_hits(line):
-                records.append({"dai": _to_dai_str(row_dai), "game": gi, "kind": k})
-    for sel in ["h1","h2",".title",".machine-name",".dai-number",".machineNo",".no",".tit",".head",".header"]:
-        el = soup.select_one(sel)
-        if el:
-            d = _extract_dai_from_text(el.get_text(" ", strip=True))
+                dais.append(_to_dai_str(row_dai)); games.append(gi); kinds.append(k)
+    for xp in _lx().heads:
+        for el in xp(root):
+            d = _extract_dai_from_text(_el_text(el))
             if d: dai_cands.append(d)
-    return records, [d for d in dai_cands if d]
-
-def _parse_hit_records_from_json_text(txt: str) -> Tuple[List[Dict], List[str]]:
-    records: List[Dict] = []
+    return (dais, games, kinds), [d for d in dai_cands if d]
+
+# 同一ボディ（go_back/タブ切替で再取得されたもの）は再パースしない
+_PARSE_CACHE: "OrderedDict[bytes, Tuple[HitCols, List[str]]]" = OrderedDict()
+_PARSE_CACHE_SIZE = 512
+_PARSE_CACHE_LOCK = threading.Lock()
+
+def _parse_html_cached(h: bytes, html: str) -> Tuple[HitCols, List[str]]:
+    """返り値はキャッシュと共有なので、呼び出し側は extend するだけで書き換えないこと"""
+    with _PARSE_CACHE_LOCK:
+        hit = _PARSE_CACHE.get(h)
+        if hit is not None:
+            _PARSE_CACHE.move_to_end(h)
+            return hit
+    hit = _parse_hit_records_from_html(html)
+    with _PARSE_CACHE_LOCK:
+        _PARSE_CACHE[h] = hit
+        if len(_PARSE_CACHE) > _PARSE_CACHE_SIZE: _PARSE_CACHE.popitem(last=False)
+    return hit
+
+# JSON のキー候補（先頭ほど優先）
+_JSON_G_KEYS = ("g","game","spin","games","games_count","total_games")
+_JSON_K_KEYS = ("k","kind","type","bonus","label","name")
+_JSON_D_KEYS = ("dai","no","number","machine","台番","台番号","machine_no","unit_no","table_no","unit","machineNo")
+_JSON_HIT_KEYS = frozenset(_JSON_G_KEYS + _JSON_K_KEYS + _JSON_D_KEYS)
+
+def _parse_hit_records_from_json_text(txt: str) -> Tuple[HitCols, List[str]]:
+    dais: List[Optional[str]] = []; games: List[int] = []; kinds: List[str] = []
     dai_cands: List[str] = []
     try:
         data = json.loads(txt)
@@ -292,131 +513,199 @@ def _parse_hit_records_from_json_text(txt: str) -> Tuple[List[Dict], List[str]]:
             row_dai = _extract_dai_from_text(line)
             if row_dai: dai_cands.append(row_dai)
             for gi, k in _scan_line_for_hits(line):
-                records.append({"dai": _to_dai_str(row_dai), "game": gi, "kind": k})
-        return records, dai_cands
-    def walk(obj):
+                dais.append(_to_dai_str(row_dai)); games.append(gi); kinds.append(k)
+        return (dais, games, kinds), dai_cands
+    # 再帰だと深いペイロードで RecursionError になるので明示スタックで前順走査
+    stack = deque([data])
+    while stack:
+        obj = stack.pop()
         if isinstance(obj, dict):
             keys = {k.lower(): k for k in obj.keys()}
-            gkey = next((obj[keys[k]] for k in ["g","game","spin","games","games_count","total_games"] if k in keys), None)
-            kkey = next((obj[keys[k]] for k in ["k","kind","type","bonus","label","name"] if k in keys), None)
-            dkey = next((obj[keys[k]] for k in ["dai","no","number","machine","台番","台番号","machine_no","unit_no","table_no","unit","machineNo"] if k in keys), None)
-            if dkey is not None:
-                d = _to_dai_str(str(dkey))
-                if d: dai_cands.append(d)
-            if gkey is not None and kkey is not None:
-                gi = _num_to_int(str(gkey))
-                if gi is not None:
-                    records.append({"dai": _to_dai_str(str(dkey)) if dkey is not None else None,
-                                    "game": gi, "kind": _kind_to_std(str(kkey))})
-            for v in obj.values(): walk(v)
+            if not _JSON_HIT_KEYS.isdisjoint(keys):
+                gkey = next((obj[keys[k]] for k in _JSON_G_KEYS if k in keys), None)
+                kkey = next((obj[keys[k]] for k in _JSON_K_KEYS if k in keys), None)
+                dkey = next((obj[keys[k]] for k in _JSON_D_KEYS if k in keys), None)
+                if dkey is not None:
+                    d = _to_dai_str(str(dkey))
+                    if d: dai_cands.append(d)
+                if gkey is not None and kkey is not None:
+                    gi = _num_to_int(str(gkey))
+                    if gi is not None:
+                        dais.append(_to_dai_str(str(dkey)) if dkey is not None else None)
+                        games.append(gi); kinds.append(_kind_to_std(str(kkey)))
+            stack.extend(reversed(obj.values()))
         elif isinstance(obj, list):
-            for v in obj: walk(v)
+            stack.extend(reversed(obj))
         elif isinstance(obj, str):
             s = _normalize_text(obj)
             row_dai = _extract_dai_from_text(s)
             if row_dai: dai_cands.append(row_dai)
             for gi, k in _scan_line_for_hits(s):
-                records.append({"dai": _to_dai_str(row_dai), "game": gi, "kind": k})
-    walk(data)
-    return records, dai_cands
+                dais.append(_to_dai_str(row_dai)); games.append(gi); kinds.append(k)
+    return (dais, games, kinds), dai_cands
 
 # ========= レスポンスリング =========
+# 保存ファイル名の連番はリング（＝並列ワーカー）をまたいで一意にする
+_RESP_SEQ = itertools.count(1)
+
 class RespRing:
+    """レスポンスはディスクに書き出し、メモリには [url, ct, path, body|None, sha1] だけ持つ。
+    書き込みは専用スレッドで行い、書き終わるまで（失敗したらそのまま）ボディをメモリに残す"""
     def __init__(self, capacity: int):
         self.buf = deque(maxlen=capacity)
         self.counter = 0
+        self.listeners: List[Tuple[Page, Callable]] = []  # close() で外す (page, handler)
+        self._q: "queue.Queue[Optional[list]]" = queue.Queue(maxsize=1024)
+        self._writer_th = threading.Thread(target=self._writer, name="resp-writer", daemon=True)
+        self._writer_th.start()
     def push(self, url: str, body: bytes, ct: Optional[str]):
-        self.buf.append((url, body, ct))
+        digest = hashlib.sha1(body).digest()
+        path: Optional[Path] = None
         try:
             h = hashlib.sha1((url+str(len(body))).encode()).hexdigest()[:8]
             self.counter += 1
             ext = ".json" if "json" in (ct or "").lower() or url.endswith(".json") else ".html"
-            path = RESP_DIR / f"resp_{self.counter:05d}_{h}{ext}"
-            with open(path, "wb") as f: f.write(body)
+            path = RESP_DIR / f"resp_{next(_RESP_SEQ):05d}_{h}{ext}"
         except Exception:
-            pass
-    def snapshot_and_clear(self) -> List[Tuple[str,bytes,Optional[str]]]:
-        items = list(self.buf); self.buf.clear(); return items
-
-def attach_global_response_listener(page: Page) -> RespRing:
-    ring = RespRing(CONFIG["resp_ring_capacity"])
+            path = None
+        entry = [url, ct, path, body, digest]
+        self.buf.append(entry)
+        if path is not None:
+            try: self._q.put_nowait(entry)
+            except queue.Full: pass  # 書き込みが詰まっているときは保存を諦める（ボディはメモリに残る）
+    def _writer(self):
+        while True:
+            entry = self._q.get()
+            try:
+                if entry is None: return
+                with open(entry[2], "wb") as f: f.write(entry[3])
+                entry[3] = None
+            except Exception:
+                pass
+            finally:
+                self._q.task_done()
+    def clear(self):
+        self.buf.clear()
+    def detach(self, page: Optional[Page] = None):
+        """page（省略時は全ページ）に付けたレスポンスリスナーを外す"""
+        keep = []
+        for pg, handler in self.listeners:
+            if page is not None and pg is not page:
+                keep.append((pg, handler)); continue
+            try: pg.remove_listener("response", handler)
+            except Exception: pass
+        self.listeners = keep
+    def close(self):
+        """レスポンスリスナーを外し、未書き込み分を書き切って書き込みスレッドを止める"""
+        self.detach()
+        self._q.put(None)
+        self._writer_th.join()
+    def snapshot_and_clear(self) -> Iterator[Tuple[str,bytes,Optional[str],bytes]]:
+        items = list(self.buf); self.buf.clear()
+        return self._read_bodies(items)
+    @staticmethod
+    def _read_bodies(items) -> Iterator[Tuple[str,bytes,Optional[str],bytes]]:
+        for url, ct, path, body, digest in items:
+            if body is None:
+                try: body = path.read_bytes()
+                except Exception: continue
+            yield url, body, ct, digest
+
+def attach_global_response_listener(page: Page, ring: Optional[RespRing] = None) -> RespRing:
+    """ring を渡すと既存のリングに合流させる（サブタブのレスポンスも同じリングで解析するため）"""
+    if ring is None: ring = RespRing(CONFIG["resp_ring_capacity"])
     def on_response(resp: Response):
         try:
             url = resp.url
             ct = (resp.headers.get("content-type","") or "").lower()
-            if any(k in url for k in CONFIG["resp_url_keywords"]) or \
-               ("json" in ct or "html" in ct or "xml" in ct or "csv" in ct or \
-                "javascript" in ct or ct.startswith("text/") or "plain" in ct):
+            if _RESP_URL_RE.search(url) or ct.startswith("text/") or any(c in ct for c in _CT_OK):
                 body = resp.body()
                 if body and len(body) <= CONFIG["resp_max_bytes"]:
                     ring.push(url, body, ct)
         except Exception:
             pass
     page.on("response", on_response)
+    ring.listeners.append((page, on_response))
     return ring
 
 def _gather_all_htmls(ctx: Union[Page, Frame]) -> List[str]:
     blobs: List[str] = []
-    try:
-        blobs.append(ctx.content())
-    except Exception:
-        pass
-    try:
-        it = ctx.evaluate("() => document.body && document.body.innerText || ''")
-        if it:
-            blobs.append(it)
-    except Exception:
-        pass
+    def grab(c: Union[Page, Frame]):
+        # content() が取れればテキストは HTML 側から抜けるので、innerText はその失敗時だけ取りに行く
+        try:
+            blobs.append(c.content())
+            return
+        except Exception:
+            pass
+        try:
+            it = c.evaluate("() => document.body && document.body.innerText || ''")
+            if it:
+                blobs.append(it)
+        except Exception:
+            pass
+    grab(ctx)
     if isinstance(ctx, Page):
         for fr in ctx.frames:
-            try:
-                blobs.append(fr.content())
-            except Exception:
-                try:
-                    it = fr.evaluate("() => document.body && document.body.innerText || ''")
-                    if it:
-                        blobs.append(it)
-                except Exception:
-                    pass
+            if fr is ctx.main_frame: continue  # page.content() と同じ
+            grab(fr)
     return blobs
 
+# パースは独立したブロブ単位の CPU 処理（lxml のパース中は GIL が外れる）なのでスレッドに逃がす。
+# Playwright の呼び出しはメインスレッドのまま
+_PARSE_POOL = ThreadPoolExecutor(max_workers=CONFIG["parse_workers"], thread_name_prefix="parse")
+
+def _parse_job(job: Tuple[Union[str, bytes], Optional[str], str, Optional[bytes]]) -> Tuple[HitCols, List[str]]:
+    data, ct, url, h = job
+    if isinstance(data, str):  # DOM から取った HTML/innerText
+        return _parse_html_cached(hashlib.sha1(data.encode("utf-8", errors="ignore")).digest(), data)
+    txt = None
+    try:
+        txt = data.decode("utf-8", errors="ignore")
+    except Exception:
+        try:
+            txt = data.decode("shift_jis", errors="ignore")
+        except Exception:
+            pass
+    if not txt:
+        return ([], [], []), []
+    if "json" in (ct or "") or url.endswith(".json"):
+        return _parse_hit_records_from_json_text(txt)
+    return _parse_html_cached(h, txt)
+
 def _parse_using_ctx_and_ring(ctx: Union[Page, Frame], page: Page, ring: RespRing, href_hint: Optional[str]) -> List[Dict]:
-    records: List[Dict] = []
+    dais: List[Optional[str]] = []; games: List[int] = []; kinds: List[str] = []
     dai_cands: List[str] = []
+    # 候補の並び（_freq_pick の同数タイブレーク）を保つため、URL 由来の候補はジョブと対にしておく
+    jobs: List[Tuple[Union[str, bytes], Optional[str], str, Optional[bytes]]] = []
+    url_cands: List[List[str]] = []
     for blob in _gather_all_htmls(ctx):
-        recs, cands = _parse_hit_records_from_html(blob)
-        records.extend(recs); dai_cands.extend(cands)
-    for url, body, ct in ring.snapshot_and_clear():
-        if href_hint:
-            d = _extract_dai_from_url(href_hint)
-            if d: dai_cands.append(d)
-        durl = _extract_dai_from_url(url)
-        if durl: dai_cands.append(durl)
-        txt = None
-        try:
-            txt = body.decode("utf-8", errors="ignore")
-        except Exception:
-            try:
-                txt = body.decode("shift_jis", errors="ignore")
-            except Exception:
-                pass
-        if not txt:
-            continue
-        if "json" in (ct or "") or url.endswith(".json"):
-            recs, cands = _parse_hit_records_from_json_text(txt)
-        else:
-            recs, cands = _parse_hit_records_from_html(txt)
-        records.extend(recs); dai_cands.extend(cands)
+        jobs.append((blob, None, "", None)); url_cands.append([])
+    d_hint = _extract_dai_from_url(href_hint) if href_hint else None
+    for url, body, ct, h in ring.snapshot_and_clear():
+        jobs.append((body, ct, url, h))
+        url_cands.append([d for d in (d_hint, _extract_dai_from_url(url)) if d])
+    for pre, (cols, cands) in zip(url_cands, _PARSE_POOL.map(_parse_job, jobs)):
+        dai_cands.extend(pre)
+        dais.extend(cols[0]); games.extend(cols[1]); kinds.extend(cols[2]); dai_cands.extend(cands)
     fallback = _freq_pick(dai_cands)
-    for r in records:
-        if not r.get("dai"):
-            r["dai"] = fallback
-    return records
+    # 巡回側は dict 前提なので、ここで初めてレコード化する
+    return [{"dai": d or fallback, "game": g, "kind": k} for d, g, k in zip(dais, games, kinds)]
 
 # ========= 詳細/タブ =========
+def _present_labels(ctx: Union[Page, Frame], labels: List[str]) -> Set[str]:
+    """ラベル×セレクタ総当たりの前に、画面上に出ているラベルだけを1往復で絞る（失敗時は全件）"""
+    try:
+        r = _psc_call(ctx, "__pscPresentLabels", labels)
+        if isinstance(r, list): return set(r)
+    except Exception:
+        pass
+    return set(labels)
+
 def _open_detail_if_needed(page: Page) -> None:
     for _ in range(CONFIG["detail_click_retries"] + 1):
+        present = _present_labels(page, DETAIL_CLICK_CANDIDATES)
         for label in DETAIL_CLICK_CANDIDATES:
+            if label not in present: continue
             for sel_tpl in DETAIL_LINK_SELECTORS[:4]:
                 if _click_if_exists(page, sel_tpl.format(label)):
                     log(f"  - click detail: {label}")
@@ -453,7 +742,9 @@ def _open_machine_data_if_present(page: Page) -> None:
 
 def _click_tabs_variants(ctx: Union[Page, Frame]) -> int:
     ok = 0
+    present = _present_labels(ctx, TAB_LABELS)
     for label in TAB_LABELS:
+        if label not in present: continue
         for sel in [f"a:has-text('{label}')", f"button:has-text('{label}')",
                     f"role=tab[name='{label}']", f"role=link[name='{label}']",
                     f"role=button[name='{label}']"]:
@@ -465,6 +756,7 @@ def _click_tabs_variants(ctx: Union[Page, Frame]) -> int:
                     ctx.wait_for_timeout(500)
                 except Exception:
                     pass
+                present = _present_labels(ctx, TAB_LABELS)  # タブ切替で出てくるラベルもあるので取り直す
                 break
     return ok
 
@@ -473,7 +765,7 @@ def _extract_cd_dai_candidates_from_blobs(ctx: Union[Page, Frame]) -> List[str]:
     blobs = _gather_all_htmls(ctx)
     cands: Set[str] = set()
     for blob in blobs:
-        for m in re.finditer(r"(?:cd_dai\s*=\s*|cd_dai\s*:\s*|cd_dai%5B%5D\s*=\s*|cd_dai%3D|cd_dai=)([0-9]{2,5})", blob, re.IGNORECASE):
+        for m in RE_CD_DAI_KV.finditer(blob):
             cands.add(m.group(1))
         for m in RE_CD_DAI_ANY.finditer(blob):
             if m.group(1): cands.add(m.group(1))
@@ -485,40 +777,10 @@ def _v06_url(base_url: str, dai: str) -> str:
 # ========= DOM 全体から台番号候補 =========
 def _harvest_dai_candidates_from_dom(ctx: Union[Page, Frame]) -> List[str]:
     try:
-        blobs = ctx.evaluate("""
-            () => {
-              const arr = [];
-              const sels = 'a, area, [onclick], [data-dai], [data-no], [data-unit], [data-machine], [data-ban], [value], [title], [alt], [aria-label]';
-              const els = document.querySelectorAll(sels);
-              els.forEach(e => {
-                const h = e.getAttribute('href') || '';
-                const oc = e.getAttribute('onclick') || '';
-                const v = e.getAttribute('value') || '';
-                const id = e.id || '';
-                const cls = e.className || '';
-                const ds = e.dataset ? JSON.stringify(e.dataset) : '';
-                const tx = (e.innerText || e.textContent || '').slice(0, 200);
-                const alt = e.getAttribute('alt') || '';
-                const title = e.getAttribute('title') || '';
-                const aria = e.getAttribute('aria-label') || '';
-                arr.push([h, oc, v, id, cls, ds, tx, alt, title, aria].join(' | '));
-              });
-              return arr;
-            }
-        """)
+        cands = _psc_call(ctx, "__pscHarvestDai") or []
     except Exception:
-        blobs = []
-    cands: Set[str] = set()
-    for s in blobs:
-        s_norm = unicodedata.normalize("NFKC", s)
-        for m in re.finditer(r"(?:dai|unit|machine|no|台|台番|台番号)[^0-9]{0,16}([0-9]{2,5})", s_norm, re.IGNORECASE):
-            cands.add(m.group(1))
-        for m in re.finditer(r"([0-9]{2,5})[^0-9]{0,16}(?:dai|unit|machine|no|台|台番|台番号)", s_norm, re.IGNORECASE):
-            cands.add(m.group(1))
-        for m in re.finditer(r"[?&#/](?:cd_dai|dai|no|unit|machine)[=/]*([0-9]{2,5})", s_norm, re.IGNORECASE):
-            cands.add(m.group(1))
-    out = sorted([d for d in cands if 2 <= len(d) <= 5])
-    return out
+        cands = []
+    return sorted({d for d in cands if isinstance(d, str) and 2 <= len(d) <= 5})
 
 # ========= DOM 内リンク収集 =========
 def _collect_dai_links_all(page: Page) -> List[Tuple[Union[Page, Frame], Dict[str,str]]]:
@@ -526,14 +788,7 @@ def _collect_dai_links_all(page: Page) -> List[Tuple[Union[Page, Frame], Dict[st
     def grab(ctx: Union[Page, Frame]):
         _scroll_and_pager_ctx(ctx, rounds=40)
         try:
-            links = ctx.eval_on_selector_all(DAI_LINK_CSS, """
-                els => els.map(e => ({
-                    h: e.getAttribute('href'),
-                    t: e.innerText || e.textContent || '',
-                    d: e.getAttribute('data-dai') || e.getAttribute('data-no') || e.getAttribute('data-unit') || e.getAttribute('data-machine') || e.getAttribute('data-ban') || '',
-                    oc: e.getAttribute('onclick') || ''
-                }))
-            """)
+            links = _psc_call(ctx, "__pscCollectDaiLinks", DAI_LINK_CSS) or []
             for it in links: items.append((ctx, it))
         except Exception:
             pass
@@ -548,40 +803,13 @@ def _probe_canvas_and_hotspots(ctx: Union[Page, Frame]) -> Tuple[int,int]:
     """Canvas等に対して格子状にclickイベントを投げて、AJAX等のレスポンス発生を促す"""
     targets = []
     try:
-        targets = ctx.evaluate("""
-            (cols, rows) => {
-              const boxes = [];
-              const pushGrid = (el) => {
-                const r = el.getBoundingClientRect();
-                if (!r.width || !r.height) return;
-                for (let i=0;i<rows;i++){
-                  for (let j=0;j<cols;j++){
-                    const x = r.left + (j+0.5)*(r.width/cols);
-                    const y = r.top  + (i+0.5)*(r.height/rows);
-                    boxes.push({x, y, el});
-                  }
-                }
-              };
-              // Canvas と、role=application/graphics-doc っぽい領域、pointer要素
-              document.querySelectorAll('canvas, [role=application], [role=graphics-document], .clickable')
-                .forEach(pushGrid);
-              return boxes.map(b => ({x: Math.floor(b.x), y: Math.floor(b.y)}));
-            }
-        """, CONFIG["probe_grid_cols"], CONFIG["probe_grid_rows"])
+        targets = _psc_call(ctx, "__pscProbe", CONFIG["probe_grid_cols"], CONFIG["probe_grid_rows"]) or []
     except Exception:
         targets = []
     clicked = 0
     for pt in targets[:600]:  # 暴走抑制
         try:
-            ctx.evaluate("""
-                (x, y) => {
-                  const el = document.elementFromPoint(x, y);
-                  if (!el) return false;
-                  const ev = new MouseEvent('click', {bubbles:true, cancelable:true, clientX:x, clientY:y});
-                  el.dispatchEvent(ev);
-                  return true;
-                }
-            """, pt["x"], pt["y"])
+            _psc_call(ctx, "__pscClickAt", pt["x"], pt["y"])
             clicked += 1
             try: ctx.wait_for_timeout(CONFIG["probe_pause_ms"])
             except Exception: pass
@@ -605,6 +833,23 @@ def _visit_and_parse_current(page: Page, ring: RespRing) -> List[Dict]:
     return _parse_using_ctx_and_ring(page, page, ring, href_hint=None)
 
 # ========= 台リンク/候補の巡回 =========
+def _fresh_dais(cands: List[Optional[str]], visited: set, limit: Optional[int]) -> List[str]:
+    """重複と訪問済みを先に落としてから上限で切る（上限は未訪問の台だけで数える）"""
+    fresh = [d for d in dict.fromkeys(cands) if d and d not in visited]
+    return fresh if limit is None else fresh[:int(limit)]
+
+def _visit_v06(page: Page, ring: RespRing, dai: str) -> Optional[List[Dict]]:
+    """v06 は別タブで開いて閉じる（元ページは触らないので go_back と再描画待ちが要らない）。開けなければ None"""
+    sub = page.context.new_page()
+    try:
+        attach_global_response_listener(sub, ring)
+        if not _safe_goto(sub, _v06_url(page.url, dai)): return None
+        return _visit_and_parse_current(sub, ring)
+    finally:
+        ring.detach(sub)
+        try: sub.close()
+        except Exception: pass
+
 def _drill_dai_links(page: Page, ring: RespRing, per_card_limit: Optional[int]) -> List[Dict]:
     out_records: List[Dict] = []
     visited_hrefs: set = set()
@@ -619,8 +864,11 @@ def _drill_dai_links(page: Page, ring: RespRing, per_card_limit: Optional[int])
         log(f"  - link_items(after v05-003): {len(link_items)}")
 
     # v06 直URLを優先
-    v06_links = [(ctx, it) for (ctx, it) in link_items if (it.get("h") or "").find("nc-v06-") >= 0 or (it.get("h") or "").find("cd_dai=") >= 0]
-    ordered = v06_links + [(ctx, it) for (ctx, it) in link_items if (ctx, it) not in v06_links]
+    v06_links, other_links = [], []
+    for ctx, it in link_items:
+        h = it.get("h") or ""
+        (v06_links if ("nc-v06-" in h or "cd_dai=" in h) else other_links).append((ctx, it))
+    ordered = v06_links + other_links
 
     def _visit_href(ctx, href, dai_hint=None):
         nav = False
@@ -638,9 +886,8 @@ def _drill_dai_links(page: Page, ring: RespRing, per_card_limit: Optional[int])
         if nav:
             try:
                 page.go_back(wait_until="domcontentloaded", timeout=CONFIG["timeout"])
-                page.wait_for_load_state("networkidle", timeout=3000)
+                _settle(page, DAI_LINK_CSS)  # 戻り先は台リンクのある一覧
             except Exception: pass
-        page.wait_for_timeout(160)
         return recs
 
     # 1-a) まずは見えているリンクを踏む
@@ -673,28 +920,13 @@ def _drill_dai_links(page: Page, ring: RespRing, per_card_limit: Optional[int])
     dom_dai_list = _harvest_dai_candidates_from_dom(page)
     log(f"  - dom_dai_candidates: {len(dom_dai_list)}")
     if dom_dai_list:
-        limit = len(dom_dai_list) if per_card_limit is None else min(len(dom_dai_list), int(per_card_limit))
         visited_v06_dom = 0
-        for d in dom_dai_list[:limit]:
-            if d in visited_dais: continue
-            target = _v06_url(page.url, d)
-            try:
-                with page.expect_navigation(wait_until="domcontentloaded", timeout=8000):
-                    page.goto(target, timeout=CONFIG["timeout"], wait_until="domcontentloaded")
-            except Exception:
-                try:
-                    page.goto(target, timeout=CONFIG["timeout"], wait_until="domcontentloaded")
-                except Exception:
-                    continue
-            recs = _visit_and_parse_current(page, ring)
+        for d in _fresh_dais(dom_dai_list, visited_dais, per_card_limit):
+            recs = _visit_v06(page, ring, d)
+            if recs is None: continue
             out_records.extend(recs)
             visited_dais.add(d)
             visited_v06_dom += 1
-            try:
-                page.go_back(wait_until="domcontentloaded", timeout=CONFIG["timeout"])
-                page.wait_for_load_state("networkidle", timeout=3000)
-            except Exception: pass
-            page.wait_for_timeout(120)
         log(f"  - visited_v06(from dom): {visited_v06_dom}")
 
     # 3) まだゼロっぽいなら Canvas/ホットスポットにプローブ
@@ -711,61 +943,29 @@ def _drill_dai_links(page: Page, ring: RespRing, per_card_limit: Optional[int])
         if recs_after_probe:
             out_records.extend(recs_after_probe)
             # 追加で cd_dai 候補を拾って v06 直叩き
-            probe_cands = set()
-            for r in recs_after_probe:
-                if r.get("dai"): probe_cands.add(_to_dai_str(r["dai"]))
+            probe_cands = [_to_dai_str(r["dai"]) for r in recs_after_probe if r.get("dai")]
             if not probe_cands:
-                probe_cands.update(_extract_cd_dai_candidates_from_blobs(page))
-            if probe_cands:
-                limit = len(probe_cands) if per_card_limit is None else min(len(probe_cands), int(per_card_limit))
-                for d in list(probe_cands)[:limit]:
-                    if not d: continue
-                    target = _v06_url(page.url, d)
-                    try:
-                        with page.expect_navigation(wait_until="domcontentloaded", timeout=8000):
-                            page.goto(target, timeout=CONFIG["timeout"], wait_until="domcontentloaded")
-                    except Exception:
-                        try:
-                            page.goto(target, timeout=CONFIG["timeout"], wait_until="domcontentloaded")
-                        except Exception:
-                            continue
-                    recs = _visit_and_parse_current(page, ring)
-                    out_records.extend(recs)
-                    visited_v06_probe += 1
-                    try:
-                        page.go_back(wait_until="domcontentloaded", timeout=CONFIG["timeout"])
-                        page.wait_for_load_state("networkidle", timeout=3000)
-                    except Exception: pass
-                    page.wait_for_timeout(120)
+                probe_cands = _extract_cd_dai_candidates_from_blobs(page)
+            for d in _fresh_dais(probe_cands, visited_dais, per_card_limit):
+                recs = _visit_v06(page, ring, d)
+                if recs is None: continue
+                out_records.extend(recs)
+                visited_dais.add(d)
+                visited_v06_probe += 1
         log(f"  - visited_v06(from probe): {visited_v06_probe}")
 
-    # 4) HTML/JSテキストから cd_dai 候補 → v06直叩き（最後の頼み）
-    if per_card_limit is None or len(out_records) == 0:
+    # 4) HTML/JSテキストから cd_dai 候補 → v06直叩き（最後の頼み。ここまで何も取れなかったときだけ）
+    if not out_records:
         cd_dai_list = _extract_cd_dai_candidates_from_blobs(page)
         log(f"  - text_cd_dai_candidates: {len(cd_dai_list)}")
         if cd_dai_list:
-            limit = len(cd_dai_list) if per_card_limit is None else min(len(cd_dai_list), int(per_card_limit))
             visited_v06_text = 0
-            for d in cd_dai_list[:limit]:
-                if d in visited_dais: continue
-                target = _v06_url(page.url, d)
-                try:
-                    with page.expect_navigation(wait_until="domcontentloaded", timeout=8000):
-                        page.goto(target, timeout=CONFIG["timeout"], wait_until="domcontentloaded")
-                except Exception:
-                    try:
-                        page.goto(target, timeout=CONFIG["timeout"], wait_until="domcontentloaded")
-                    except Exception:
-                        continue
-                recs = _visit_and_parse_current(page, ring)
+            for d in _fresh_dais(cd_dai_list, visited_dais, per_card_limit):
+                recs = _visit_v06(page, ring, d)
+                if recs is None: continue
                 out_records.extend(recs)
                 visited_dais.add(d)
                 visited_v06_text += 1
-                try:
-                    page.go_back(wait_until="domcontentloaded", timeout=CONFIG["timeout"])
-                    page.wait_for_load_state("networkidle", timeout=3000)
-                except Exception: pass
-                page.wait_for_timeout(120)
             log(f"  - visited_v06(from text): {visited_v06_text}")
 
     # 5) 何も取れなければ現在ページを解析
@@ -775,34 +975,70 @@ def _drill_dai_links(page: Page, ring: RespRing, per_card_limit: Optional[int])
     return out_records
 
 # ========= 一覧→機種カード→巡回 =========
-def _collect_from_v13(page: Page, max_cards: Optional[int]) -> pd.DataFrame:
-    _infinite_scroll_and_pager(page)
-    card_selectors = [
-        "a[href].card:visible","a:has(.card):visible",".card:visible",
-        "a[href].machine:visible","a[href]:visible",
-    ]
-    cards: Optional[Locator] = None
-    for sel in card_selectors:
+def _find_cards(page: Page) -> Tuple[Optional[Locator], Optional[str]]:
+    """一覧ごとに _CARD_SELECTORS の優先順で当たりを決め、(Locator, セレクタ) を返す"""
+    # 優先順を保ったまま1往復で当たりを決める。見つからない・失敗したときは従来どおり1つずつ count
+    # （querySelectorAll は shadow root を貫通せず可視判定も Playwright と違うので、-1 は「無い」と言い切れない）
+    try:
+        idx = _psc_call(page, "__pscFirstVisible", [sel.replace(":visible", "") for sel in _CARD_SELECTORS])
+        if isinstance(idx, int) and idx >= 0:
+            return page.locator(_CARD_SELECTORS[idx]), _CARD_SELECTORS[idx]
+    except Exception:
+        pass
+    for sel in _CARD_SELECTORS:
         loc = page.locator(sel)
-        if loc.count() > 0: cards = loc; break
-    if cards is None or cards.count() == 0:
-        log("カードが見つかりません（セレクタ要調整）")
-        return pd.DataFrame(columns=["台番","game","kind","source_url","scraped_at"])
-
-    total = cards.count()
-    if max_cards: total = min(total, max_cards)
-    log(f"カード検出: {cards.count()} 件 → 取得対象: {total} 件")
-
-    ring = attach_global_response_listener(page)
-    rows = []
-    for i in range(total):
-        card = cards.nth(i)
-        href_card = None
-        try: href_card = card.get_attribute("href")
-        except Exception: pass
-
+        if loc.count() > 0: return loc, sel
+    return None, None
+
+# カード1枚分の明細行は (台番, game, kind, source_url, scraped_at) のタプルで持ち、最後に列から Arrow 表を作る
+CardRow = Tuple[Optional[str], int, str, str, str]
+_KIND_DICT = pa.array(["BIG", "REG"])
+HITS_SCHEMA = pa.schema([
+    ("台番", pa.string()), ("game", pa.int64()), ("kind", pa.dictionary(pa.int8(), pa.string())),
+    ("source_url", pa.string()), ("scraped_at", pa.string()),
+])
+# kind は先頭1文字で決める（B/b/Ｂ/ｂ → BIG、それ以外 → REG）
+_KIND_MAP = {"B": "BIG", "b": "BIG", "Ｂ": "BIG", "ｂ": "BIG"}
+
+def _hits_table(rows: List[CardRow]) -> pa.Table:
+    """スキーマ固定（kind の辞書も BIG/REG 固定）なので、開始 URL ごとの表はそのまま concat_tables できる"""
+    dai_l: List[Optional[str]] = []; game_l: List[int] = []; kind_l: List[int] = []; src_l: List[str] = []; ts_l: List[str] = []
+    for d, g, k, src, ts in rows:
+        if not -2**63 <= g < 2**63: continue  # 壊れた JSON の桁あふれ値で表作成ごと落ちないように捨てる
+        dai_l.append(d); game_l.append(g); kind_l.append(0 if k == "BIG" else 1); src_l.append(src); ts_l.append(ts)
+    return pa.Table.from_arrays([
+        pa.array(dai_l, pa.string()),
+        pa.array(game_l, pa.int64()),  # JSON 由来のゲーム数は上限が無いので int64
+        pa.DictionaryArray.from_arrays(pa.array(kind_l, pa.int8()), _KIND_DICT),
+        pa.array(src_l, pa.string()),
+        pa.array(ts_l, pa.string()),
+    ], schema=HITS_SCHEMA)
+
+def _is_navigable_href(href: Optional[str]) -> bool:
+    h = (href or "").strip()
+    return bool(h) and not h.startswith("#") and not h.lower().startswith("javascript:")
+
+def _collect_one_card(page: Page, ring: RespRing, cards: Optional[Locator], i: int, href_card: Optional[str], list_url: str,
+                      card_sel: Optional[str] = None) -> Optional[List[CardRow]]:
+    """カード1枚分。遷移できる href は URL へ直行し、無ければ（モーダル型など）一覧上でクリックする。
+    cards を持たない並列ワーカーで URL 直行に失敗したときは None（呼び出し側で一覧ページから取り直す）"""
+    ring.clear()  # 前のカード（戻り遷移など）のレスポンスを持ち越さない
+    nav = via_goto = False
+    if _is_navigable_href(href_card):
+        try:
+            page.goto(urljoin(list_url, href_card), wait_until="domcontentloaded", timeout=CONFIG["timeout"])
+            nav = via_goto = True
+        except Exception:
+            pass
+    url_before = list_url
+    if not nav and cards is None:
+        return None
+    if not nav:
+        if page.url != list_url:  # 直前のカードで一覧から離れている
+            try: page.goto(list_url, wait_until="domcontentloaded", timeout=CONFIG["timeout"])
+            except Exception: pass
         url_before = page.url
-        nav = False
+        card = cards.nth(i)
         try:
             with page.expect_navigation(wait_until="domcontentloaded", timeout=8000):
                 card.click(timeout=3000)
@@ -812,38 +1048,122 @@ def _collect_from_v13(page: Page, max_cards: Optional[int]) -> pd.DataFrame:
             except Exception: pass
             nav = False
 
-        _open_detail_if_needed(page)
-        _scroll_and_pager_ctx(page, rounds=40)
-        for fr in page.frames:
-            try: _scroll_and_pager_ctx(fr, rounds=20)
-            except Exception: pass
+    _open_detail_if_needed(page)
+    _scroll_and_pager_ctx(page, rounds=8, stable_rounds=2)
+    for fr in page.frames:
+        try: _scroll_and_pager_ctx(fr, rounds=8, stable_rounds=2)
+        except Exception: pass
 
-        recs = _drill_dai_links(page, ring, CONFIG["per_card_dai_limit"])
-        if not recs:
-            recs = _visit_and_parse_current(page, ring)
+    recs = _drill_dai_links(page, ring, CONFIG["per_card_dai_limit"])
+    if not recs:
+        recs = _visit_and_parse_current(page, ring)
 
-        for r in recs:
-            if r.get("game") is None or r.get("kind") is None:
-                continue
-            rows.append({
-                "台番": _to_dai_str(r.get("dai")),
-                "game": int(r["game"]),
-                "kind": "BIG" if str(r["kind"]).upper().startswith("B") else "REG",
-                "source_url": page.url if nav else (href_card or url_before),
-                "scraped_at": datetime.now().isoformat()
-            })
+    rows: List[CardRow] = []
+    scraped_at = datetime.now().isoformat()  # カード単位の時刻で十分なので行ごとには取らない
+    for r in recs:
+        if r.get("game") is None or r.get("kind") is None:
+            continue
+        rows.append((
+            _to_dai_str(r.get("dai")),
+            int(r["game"]),
+            _KIND_MAP.get(str(r["kind"])[:1], "REG"),
+            page.url if nav else (href_card or url_before),
+            scraped_at,
+        ))
+
+    # URL 直行で来たカードは戻らない（次のカードも URL 直行、モーダル型は一覧を開き直す）
+    if nav and not via_goto:
+        try:
+            page.go_back(wait_until="domcontentloaded", timeout=CONFIG["timeout"])
+            _settle(page, card_sel)  # 一覧のカードが出れば次へ進める
+        except Exception: pass
+    elif not nav:
+        for sel in _MODAL_CLOSE_SELECTORS:
+            if _click_if_exists(page, sel, timeout=900):
+                # 閉じるボタン自体が消えたらモーダルも閉じている（アニメーション分だけ待つ）
+                try: page.locator(sel).first.wait_for(state="hidden", timeout=800)
+                except Exception: pass
+                break
+    return rows
 
-        if nav:
+def _collect_card_shard(list_url: str, shard: List[Tuple[int, str]], state: Optional[dict]) -> Dict[int, List[CardRow]]:
+    """並列ワーカー: 自前の Playwright/ブラウザで URL 直行カードを回す（sync API はスレッドをまたげない）。
+    開けなかったカードは結果に含めず、呼び出し側で一覧ページから取り直す"""
+    done: Dict[int, List[CardRow]] = {}
+    try:
+        with sync_playwright() as p:
+            browser, context, page = _new_context(p, headless=CONFIG["headless"], storage_state=state)
+            ring = attach_global_response_listener(page)
             try:
-                page.go_back(wait_until="domcontentloaded", timeout=CONFIG["timeout"])
-                page.wait_for_load_state("networkidle", timeout=3000)
-            except Exception: pass
-        else:
-            for sel in ["button:has-text('閉じる')", ".modal-close", ".close", "button[aria-label='Close']"]:
-                if _click_if_exists(page, sel, timeout=900): page.wait_for_timeout(200); break
-        page.wait_for_timeout(200)
+                for i, href in shard:
+                    try: recs = _collect_one_card(page, ring, None, i, href, list_url)
+                    except Exception: recs = None
+                    if recs is not None: done[i] = recs
+            finally:
+                ring.close()
+                context.close(); browser.close()
+    except Exception as e:
+        log(f"  - 並列ワーカー停止: {e}")
+    return done
+
+def _collect_from_v13(page: Page, max_cards: Optional[int]) -> pa.Table:
+    _infinite_scroll_and_pager(page)
+    cards, card_sel = _find_cards(page)
+    if cards is None or cards.count() == 0:
+        log("カードが見つかりません（セレクタ要調整）")
+        return _hits_table([])
+
+    # href は最初に1往復でまとめて取る（カードごとの get_attribute を省く）
+    try: hrefs: List[Optional[str]] = cards.evaluate_all("els => els.map(e => e.getAttribute('href'))")
+    except Exception: hrefs = []
+    total = len(hrefs) or cards.count()
+    log(f"カード検出: {total} 件 → 取得対象: {min(total, max_cards) if max_cards else total} 件")
+    if max_cards: total = min(total, max_cards)
+    hrefs = (hrefs + [None] * total)[:total]
+
+    list_url = page.url
+    by_card: Dict[int, List[CardRow]] = {}
+    serial = list(range(total))
+    # URL で開けるカードはワーカーごとのブラウザに振り分けて並列に回す
+    n = max(1, int(CONFIG.get("parallelism") or 1))
+    nav_cards = [(i, h) for i, h in enumerate(hrefs) if _is_navigable_href(h)]
+    if n > 1 and len(nav_cards) > 1:
+        shards = [nav_cards[k::n] for k in range(min(n, len(nav_cards)))]
+        log(f"  - 並列: {len(nav_cards)} 件を {len(shards)} ワーカーで")
+        # 一覧を開いた時点の Cookie/localStorage をワーカーへ渡す（auth.json だけだと一覧で張られたセッションが無い）
+        try: state = page.context.storage_state()
+        except Exception: state = None
+        with ThreadPoolExecutor(max_workers=len(shards), thread_name_prefix="card") as ex:
+            for done in ex.map(lambda sh: _collect_card_shard(list_url, sh, state), shards):
+                by_card.update(done)
+        serial = [i for i in range(total) if i not in by_card]  # モーダル型と、ワーカーで開けなかったもの
 
-    return pd.DataFrame(rows)
+    ring = attach_global_response_listener(page)
+    try:
+        for i in serial:
+            by_card[i] = _collect_one_card(page, ring, cards, i, hrefs[i], list_url, card_sel) or []
+    finally:
+        ring.close()  # 例外で抜けても書き込み待ちのダンプを書き切り、リスナーを外す
+    return _hits_table([r for i in range(total) for r in by_card.get(i, [])])
+
+# ========= 出力 =========
+def _write_csv(df: pd.DataFrame, path: Path) -> None:
+    """pyarrow で書き出す。書式は従来の to_csv(index=False, encoding="utf-8-sig") と同じにする:
+    先頭に BOM、クォート無し、改行は os.linesep、float は repr（499.0 を 499 にしない）。
+    クォートが要る値（, " 改行を含む source_url 等）があるときは to_csv にそのまま任せる"""
+    out = df.copy()
+    for c in out.columns[[pd.api.types.is_float_dtype(t) for t in out.dtypes]]:
+        out[c] = out[c].map(lambda v: "" if pd.isna(v) else repr(v)).astype("string")
+    buf = io.BytesIO()
+    try:
+        pacsv.write_csv(pa.Table.from_pandas(out, preserve_index=False), buf,
+                        write_options=pacsv.WriteOptions(quoting_style="none", quoting_header="none", eol=os.linesep))
+    except pa.ArrowInvalid:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+        return
+    with open(path, "wb") as f:
+        f.write(codecs.BOM_UTF8)
+        f.write(buf.getbuffer())
 
 # ========= メイン =========
 def main():
@@ -854,7 +1174,7 @@ def main():
     except Exception:
         pass
 
-    all_rows: List[pd.DataFrame] = []
+    all_rows: List[pa.Table] = []
 
     with sync_playwright() as p:
         browser, context, page = _new_context(p, headless=CONFIG["headless"])
@@ -862,8 +1182,8 @@ def main():
             for url in CONFIG["start_urls"]:
                 log(f"RUN: {url}")
                 _goto(page, url)
-                df = _collect_from_v13(page, CONFIG["max_cards"])
-                if not df.empty: all_rows.append(df)
+                tbl = _collect_from_v13(page, CONFIG["max_cards"])
+                if tbl.num_rows: all_rows.append(tbl)
         finally:
             context.close(); browser.close()
 
@@ -871,10 +1191,15 @@ def main():
         log("収集できた当たり履歴がありませんでした。デバッグ用のHTML/レスポンスは data/raw に保存します。")
         return
 
-    hits_df = pd.concat(all_rows, ignore_index=True)
+    # 表は同じスキーマなので Arrow 上で連結し、pandas へは最後に1回だけ変換する
+    hits_df = pa.concat_tables(all_rows).to_pandas()
     # 正規化＆重複除去
-    hits_df["台番"] = hits_df["台番"].astype("string").fillna("").map(lambda s: _to_dai_str(str(s)) if s else None)
-    hits_df["kind"] = hits_df["kind"].str.upper().replace({"ＢＩＧ":"BIG","ＲＥＧ":"REG"})
+    # _to_dai_str と同じ規則（NFKC→カンマは区切り扱い→最初の2〜5桁）を列まとめて当てる
+    hits_df["台番"] = (
+        hits_df["台番"].astype("string").str.normalize("NFKC")
+        .str.replace(",", " ", regex=False).str.extract(r"([0-9]{2,5})", expand=False)
+    )
+    hits_df["kind"] = hits_df["kind"].astype("string").str.normalize("NFKC").str.upper()
     hits_df = (
         hits_df
         .drop_duplicates(subset=["台番","game","kind"])
@@ -883,7 +1208,7 @@ def main():
     )
 
     out_hits = OUT_DIR / f"pscube_hits_{ts}.csv"
-    hits_df.to_csv(out_hits, index=False, encoding="utf-8-sig")
+    _write_csv(hits_df, out_hits)
     log(f"SAVE: ヒット明細 {out_hits} ({len(hits_df)}行)")
 
     agg_src = hits_df.dropna(subset=["台番"]).copy()
@@ -892,12 +1217,12 @@ def main():
         return
 
     agg = (
-        agg_src.pivot_table(index="台番", columns="kind", values="game", aggfunc=["count","mean"])
-        .sort_index().fillna(0)
+        agg_src.groupby(["台番","kind"], sort=True)["game"].agg(["count","mean"])
+        .unstack("kind", fill_value=0)
     )
     agg.columns = [f"{a}_{b}" for a,b in agg.columns]
     out_agg = OUT_DIR / f"pscube_hits_summary_{ts}.csv"
-    agg.to_csv(out_agg, encoding="utf-8-sig")
+    _write_csv(agg.reset_index(), out_agg)
     log(f"SAVE: 集計 {out_agg} ({len(agg)}台)")
 
 if __name__ == "__main__":